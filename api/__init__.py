@@ -1,14 +1,38 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
+import os
 from .routes import router
 
+try:
+    import orjson  # noqa: F401
+    DefaultResponse = ORJSONResponse
+except ImportError:
+    # orjson is optional, fall back to the stdlib encoder
+    DefaultResponse = JSONResponse
+
+HEALTH_BODY = b'{"status":"healthy"}'
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers cache Vite's content-hashed assets"""
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        # Only files under assets/ carry a content hash in their name, so
+        # index.html and public/ files keep the default revalidation
+        # (StaticFiles hands us an OS-normalized path, hence os.sep)
+        if path.split(os.sep, 1)[0] == "assets" and response.status_code == 200:
+            response.headers["cache-control"] = "public, max-age=31536000, immutable"
+        return response
+
 def create_app(dev_mode: bool = False):
     """Create and configure FastAPI application"""
     app = FastAPI(
         title="TAK Manager API",
-        description="API for managing TAK Server Docker containers"
+        description="API for managing TAK Server Docker containers",
+        default_response_class=DefaultResponse
     )
 
     # Add CORS middleware - more permissive in dev mode
@@ -19,20 +43,24 @@ def create_app(dev_mode: bool = False):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Let the webview reuse preflight results instead of sending an
+        # OPTIONS request ahead of most API calls (Chromium caps this at 2h)
+        max_age=7200,
     )
 
     # Include API routes
     app.include_router(router, prefix="/api")
 
-    # Health check endpoint
-    @app.get('/health')
+    # Health check endpoint, polled during startup so skip serialization.
+    # The startup probe sends HEAD, which FastAPI only answers when listed.
+    @app.api_route('/health', methods=['GET', 'HEAD'])
     async def health_check():
-        return {'status': 'healthy'}
+        return Response(content=HEALTH_BODY, media_type="application/json")
 
-    # Only serve static files in production mode
+    # Only serve static files in production mode. The directory may still be
+    # being built when the app is created, so it is checked on first request.
     if not dev_mode:
         web_dir = Path(__file__).parent.parent / "web" / "dist"
-        if web_dir.exists():
-            app.mount("/", StaticFiles(directory=str(web_dir), html=True))
+        app.mount("/", CachedStaticFiles(directory=str(web_dir), html=True, check_dir=False))
 
     return app 
\ No newline at end of file
@@ -1,51 +1,124 @@
 import subprocess
 import platform
+import collections
+import contextlib
 import docker
+import functools
+import hashlib
+import json
+import logging
+import re
+import shutil
+import stat
+import threading
 import time
+import requests
+import yaml
+from packaging.version import InvalidVersion, Version
 from pathlib import Path
+from typing import Final
 import os
 import sys
+from api.handlers.path_handler import parse_env_file
 
+try:
+    from jeepney import DBusAddress, MessageType, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:
+    # jeepney is optional, systemd is then driven through systemctl
+    open_dbus_connection = None
+
+# Silent unless the application configures logging (dev runs do)
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Seconds to wait on a daemon liveness check before treating it as down
+_PING_TIMEOUT = 2
+
+# Set once setup_environment has patched PATH for this process
+_ENV_DONE = False
+# Set once the data directories have been created and permissioned
+_DIRS_READY = False
+# (mtime_ns, values) of the last parsed persistent .env file
+_env_cache = None
+# compose file path -> (mtime_ns, parsed YAML)
+_compose_cache = {}
+
+# Docker stays installed once seen; a negative result is re-checked so
+# installing Docker while the app is open is picked up
+_docker_installed = False
+
+# Whether this process has started the container and not stopped it since
+_container_started = False
+
+# Image tags known to be present in the daemon
+_loaded_images = set()
+# Background image load started once the daemon is known to be running
+_prefetch_thread = None
+_prefetch_lock = threading.Lock()
+
+# Shared Docker API client, created on first use
+_docker_client = None
+_client_lock = threading.Lock()
+
+# Compose service started by the app
+COMPOSE_SERVICE = "prod"
+# Service keys that can be expressed as a single containers.run() call;
+# anything else makes us fall back to the docker compose CLI
+_SDK_SERVICE_KEYS = {
+    'image', 'container_name', 'environment', 'ports', 'volumes',
+    'restart', 'command', 'working_dir',
+}
+_SDK_TOP_LEVEL_KEYS = {'version', 'name', 'services'}
+# $$, ${VAR}, ${VAR:-default}, ${VAR-default} and $VAR
+_COMPOSE_VAR_RE = re.compile(r'\$(?:(\$)|\{(\w+)(?:(:?-)([^}]*))?\}|(\w+))')
+_VOLUME_RE = re.compile(r'^((?:[A-Za-z]:)?[^:]+):([^:]+)(?::(\w+))?$')
+# Bundled image archives: tak-manager-<version>.tar[.gz]
+_IMAGE_TAR_RE = re.compile(r'^tak-manager-(.+?)\.tar(?:\.gz)?$')
+_CONFIG_HASH_LABEL = 'tak-manager.config-hash'
+
+# Host platform and bundle state are fixed for the life of the process
+_SYSTEM: Final = platform.system().lower()
+_IS_WIN: Final = _SYSTEM == "windows"
+_IS_MAC: Final = _SYSTEM == "darwin"
+_IS_LINUX: Final = _SYSTEM == "linux"
+_FROZEN: Final = getattr(sys, 'frozen', False)
+
+if _FROZEN:
+    if _IS_MAC:
+        # On macOS, resources are in Contents/Resources
+        _RESOURCE_BASE = os.path.abspath(os.path.join(
+            os.path.dirname(sys.executable),
+            '../Resources'
+        ))
+    else:
+        # On other platforms, use _MEIPASS
+        _RESOURCE_BASE = getattr(sys, '_MEIPASS', os.path.dirname(sys.executable))
+else:
+    # Development mode - go up 2 levels from handlers directory
+    _RESOURCE_BASE = os.path.abspath(os.path.join(
+        os.path.dirname(__file__),
+        '../..'  # Go from handlers -> api -> project root
+    ))
+
+@functools.lru_cache(maxsize=128)
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
-    try:
-        # Check if we're running in a packaged app
-        if getattr(sys, 'frozen', False):
-            # We're in a packaged app
-            if platform.system().lower() == "darwin":
-                # On macOS, resources are in Contents/Resources
-                base_path = os.path.abspath(os.path.join(
-                    os.path.dirname(sys.executable),
-                    '../Resources'
-                ))
-            else:
-                # On other platforms, use _MEIPASS
-                base_path = sys._MEIPASS
-        else:
-            # Development mode - go up 2 levels from handlers directory
-            base_path = os.path.abspath(os.path.join(
-                os.path.dirname(__file__),
-                '../..'  # Go from handlers -> api -> project root
-            ))
-        
-        full_path = os.path.join(base_path, relative_path)
-        # Use print only in development mode or log to file instead of console
-        if not getattr(sys, 'frozen', False):
-            print(f"Resource path for {relative_path}: {full_path}")
-        return full_path
-    except Exception as e:
-        # Log to file instead of console in production
-        if not getattr(sys, 'frozen', False):
-            print(f"Error in get_resource_path: {e}")
-        raise
+    full_path = os.path.join(_RESOURCE_BASE, relative_path)
+    logger.debug("Resource path for %s: %s", relative_path, full_path)
+    return full_path
+
+# Bundled resources used on every container start, resolved once at import
+COMPOSE_FILE = "docker-compose.yml"
+COMPOSE_FILE_PATH = get_resource_path(COMPOSE_FILE)
+ENV_SRC_PATH = get_resource_path(".env")
 
 def start_docker_desktop():
     """Start Docker Desktop application or service"""
-    system = platform.system().lower()
     try:
-        if system == "darwin":  # macOS
+        if _IS_MAC:  # macOS
             subprocess.Popen(["open", "-a", "Docker"])
-        elif system == "windows":  # Windows
+        elif _IS_WIN:  # Windows
             # Properly launch Docker Desktop on Windows
             # Use START command with correct syntax and hide the console window
             startupinfo = None
@@ -70,8 +143,12 @@ def start_docker_desktop():
                     # Fallback to shell command but hide window
                     subprocess.Popen('cmd /c start "" "Docker Desktop"', shell=True, 
                                     startupinfo=startupinfo)
-        elif system == "linux":  # Linux
-            # Try systemd service first
+        elif _IS_LINUX:  # Linux
+            # Ask systemd directly over D-Bus, user instance first (rootless
+            # Docker), then the system instance
+            if _start_systemd_unit('SESSION') or _start_systemd_unit('SYSTEM'):
+                return wait_for_docker()
+            # Fall back to systemctl when D-Bus is unavailable, user service first
             try:
                 subprocess.run(['systemctl', '--user', 'start', 'docker'], check=True)
             except subprocess.CalledProcessError:
@@ -79,22 +156,62 @@ def start_docker_desktop():
                     # Try system-wide service
                     subprocess.run(['sudo', 'systemctl', 'start', 'docker'], check=True)
                 except subprocess.CalledProcessError:
-                    if not getattr(sys, 'frozen', False):
-                        print("Could not start Docker service. Please ensure Docker is installed and the service is enabled.")
+                    logger.warning("Could not start Docker service. Please ensure Docker is installed and the service is enabled.")
                     return False
-        # Give Docker some time to start
-        time.sleep(5)
-        return True
+        # Return as soon as the daemon answers rather than after a fixed delay
+        return wait_for_docker()
     except Exception as e:
-        if not getattr(sys, 'frozen', False):
-            print(f"Failed to start Docker Desktop/Service: {e}")
+        logger.error("Failed to start Docker Desktop/Service: %s", e)
         return False
 
+def _start_systemd_unit(bus: str, unit: str = 'docker.service') -> bool:
+    """Send systemd's StartUnit over D-Bus, True if the start job was accepted"""
+    if open_dbus_connection is None:
+        return False
+    systemd = DBusAddress(
+        '/org/freedesktop/systemd1',
+        bus_name='org.freedesktop.systemd1',
+        interface='org.freedesktop.systemd1.Manager',
+    )
+    try:
+        conn = open_dbus_connection(bus=bus)
+        try:
+            reply = conn.send_and_get_reply(
+                new_method_call(systemd, 'StartUnit', 'ss', (unit, 'replace')), timeout=5
+            )
+        finally:
+            conn.close()
+    except Exception as e:
+        # No such bus (e.g. no user session), timeout or the like
+        logger.debug("D-Bus StartUnit on %s bus failed: %s", bus, e)
+        return False
+    # Errors such as an unknown unit or a polkit denial come back as replies
+    return reply.header.message_type == MessageType.method_return
+
+def wait_for_docker(timeout: float = 30) -> bool:
+    """Poll the Docker daemon with backoff until it responds or timeout expires"""
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    while True:
+        try:
+            _ping()
+            return True
+        except (docker.errors.DockerException, requests.exceptions.RequestException) as e:
+            # The daemon may have restarted, reconnect on the next attempt
+            _reset_client()
+            error = e
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning("Docker daemon not responding: %s", error)
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 1.5, 2.0)
+
 # Helper function to create proper startupinfo for Windows to hide console windows
 def get_startupinfo():
     """Get startupinfo object to hide console windows on Windows"""
     startupinfo = None
-    if platform.system().lower() == "windows" and hasattr(subprocess, 'STARTUPINFO'):
+    if _IS_WIN and hasattr(subprocess, 'STARTUPINFO'):
         startupinfo = subprocess.STARTUPINFO()
         startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
         startupinfo.wShowWindow = 0  # SW_HIDE
@@ -102,31 +219,54 @@ def get_startupinfo():
         startupinfo.dwFlags |= subprocess.CREATE_NO_WINDOW
     return startupinfo
 
+def _docker_path_file():
+    """File remembering the docker binary between packaged launches"""
+    return os.path.join(get_app_data_dir(), ".docker_path")
+
+def _forget_docker_binary():
+    """Drop the remembered docker binary so the next lookup searches again"""
+    get_docker_binary.cache_clear()
+    try:
+        os.remove(_docker_path_file())
+    except OSError:
+        pass
+
+@functools.lru_cache(maxsize=1)
 def get_docker_binary():
     """Get the absolute path to the docker binary"""
-    system = platform.system().lower()
-    
-    if system == "windows":
-        # Common Windows Docker paths
+    # Packaged installs reuse the path found on a previous launch
+    if _FROZEN:
+        try:
+            with open(_docker_path_file(), 'r') as f:
+                docker_path = f.read().strip()
+            if os.path.isfile(docker_path) and os.access(docker_path, os.X_OK):
+                return docker_path
+        except OSError:
+            pass
+
+    docker_path = _find_docker_binary()
+    if _FROZEN and os.path.isabs(docker_path):
+        try:
+            with open(_docker_path_file(), 'w') as f:
+                f.write(docker_path)
+        except OSError:
+            pass
+    return docker_path
+
+def _find_docker_binary():
+    """Search PATH and the usual install locations for the docker binary"""
+    # First check if docker is in PATH
+    docker_path = shutil.which('docker')
+    if docker_path:
+        return docker_path
+
+    # Then check common locations
+    if _IS_WIN:
         docker_paths = [
             r"C:\Program Files\Docker\Docker\resources\bin\docker.exe",
             r"C:\Program Files\Docker\Docker\resources\docker.exe",
             r"C:\ProgramData\DockerDesktop\version-bin\docker.exe"
         ]
-        
-        # First check if docker is in PATH
-        if os.environ.get('PATH'):
-            for path in os.environ['PATH'].split(os.pathsep):
-                docker_path = os.path.join(path, 'docker.exe')
-                if os.path.isfile(docker_path) and os.access(docker_path, os.X_OK):
-                    return docker_path
-        
-        # Then check common locations
-        for path in docker_paths:
-            if os.path.isfile(path) and os.access(path, os.X_OK):
-                return path
-        
-        return 'docker'  # Fallback to just 'docker' if not found
     else:
         # Unix-like systems (macOS, Linux)
         docker_paths = [
@@ -134,24 +274,19 @@ def get_docker_binary():
             '/opt/homebrew/bin/docker',  # Apple Silicon Homebrew
             '/usr/bin/docker',  # System installation
         ]
-        
-        # First check if docker is in PATH
-        if os.environ.get('PATH'):
-            for path in os.environ['PATH'].split(os.pathsep):
-                docker_path = os.path.join(path, 'docker')
-                if os.path.isfile(docker_path) and os.access(docker_path, os.X_OK):
-                    return docker_path
-        
-        # Then check common locations
-        for path in docker_paths:
-            if os.path.isfile(path) and os.access(path, os.X_OK):
-                return path
-        
-        return 'docker'  # Fallback to just 'docker' if not found
+    for path in docker_paths:
+        if os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+
+    return 'docker'  # Fallback to just 'docker' if not found
 
 def setup_environment():
     """Setup the environment with necessary paths"""
-    if platform.system().lower() == "darwin":
+    global _ENV_DONE
+    if _ENV_DONE:
+        return
+    _ENV_DONE = True
+    if _IS_MAC:
         # Add common binary paths to PATH if not already present
         paths_to_add = [
             '/usr/local/bin',  # Homebrew
@@ -167,195 +302,571 @@ def setup_environment():
         if new_paths:
             os.environ['PATH'] = os.pathsep.join([*new_paths, current_path])
 
+def _compose_plugin_present() -> bool:
+    """Check the standard CLI plugin directories for the compose plugin"""
+    name = 'docker-compose.exe' if _IS_WIN else 'docker-compose'
+    docker_config = os.environ.get('DOCKER_CONFIG') or str(Path.home() / '.docker')
+    plugin_dirs = [Path(docker_config) / 'cli-plugins']
+    if _IS_WIN:
+        program_files = Path(os.environ.get('ProgramFiles', 'C:\\Program Files'))
+        plugin_dirs += [
+            program_files / 'Docker' / 'cli-plugins',
+            program_files / 'Docker' / 'Docker' / 'resources' / 'cli-plugins',
+        ]
+    else:
+        plugin_dirs += [Path(p) for p in (
+            '/usr/local/lib/docker/cli-plugins',
+            '/usr/local/libexec/docker/cli-plugins',
+            '/usr/lib/docker/cli-plugins',
+            '/usr/libexec/docker/cli-plugins',
+        )]
+        if _IS_MAC:
+            plugin_dirs.append(Path('/Applications/Docker.app/Contents/Resources/cli-plugins'))
+    return any((d / name).is_file() for d in plugin_dirs)
+
 def check_docker_installed() -> bool:
     """Check if Docker is installed and accessible"""
+    global _docker_installed
+    if _docker_installed:
+        return True
+    try:
+        # A reachable daemon means Docker is installed, no CLI spawn needed
+        _ping()
+        _docker_installed = True
+        return True
+    except (docker.errors.DockerException, requests.exceptions.RequestException):
+        _reset_client()
     try:
+        # Daemon isn't up yet, fall back to probing the CLI
         setup_environment()
         docker_bin = get_docker_binary()
-        startupinfo = get_startupinfo()
-        subprocess.run([docker_bin, '--version'], capture_output=True, text=True, check=True, startupinfo=startupinfo)
-        subprocess.run([docker_bin, 'compose', 'version'], capture_output=True, text=True, check=True, startupinfo=startupinfo)
+        # A resolved CLI plus the compose plugin on disk is enough, no spawn
+        if os.path.isabs(docker_bin) and _compose_plugin_present():
+            _docker_installed = True
+            return True
+        # `compose version` fails unless the docker CLI itself works, so a
+        # single spawn covers both
+        subprocess.run(
+            [docker_bin, 'compose', 'version'],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=3.0,
+            startupinfo=get_startupinfo()
+        )
+        _docker_installed = True
         return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    except FileNotFoundError:
+        # The resolved binary is gone (e.g. Docker was moved or reinstalled)
+        _forget_docker_binary()
         return False
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return False
+
+def _get_client():
+    """Get the shared Docker client, connecting on first use"""
+    global _docker_client
+    with _client_lock:
+        if _docker_client is None:
+            # Creating the client queries the daemon's API version; bound
+            # that like a ping so a hung daemon can't stall us for a minute,
+            # then restore the default for real work such as image loads
+            client = docker.from_env(timeout=_PING_TIMEOUT)
+            client.api.timeout = docker.constants.DEFAULT_TIMEOUT_SECONDS
+            _docker_client = client
+        return _docker_client
+
+def _ping():
+    """Ping the daemon, bounded by _PING_TIMEOUT rather than the client's timeout
+
+    DockerClient.ping() takes no timeout and the shared client waits up to a
+    minute per request, so the ping is issued with a per-request timeout.
+    """
+    api = _get_client().api
+    return api._result(api._get(api._url('/_ping'), timeout=_PING_TIMEOUT)) == 'OK'
+
+def _reset_client():
+    """Drop the shared client so the next call reconnects"""
+    global _docker_client
+    with _client_lock:
+        client, _docker_client = _docker_client, None
+    if client is not None:
+        # Release its pooled connections instead of waiting for GC
+        try:
+            client.close()
+        except Exception:
+            pass
+
+def _retry_on_disconnect(operation):
+    """Run operation(client), reconnecting and retrying once on a dropped connection
+
+    A daemon restart leaves the shared client's pooled connections dead; the
+    request never reached the daemon, so repeating it on a fresh client is safe.
+    """
+    try:
+        return operation(_get_client())
+    except requests.exceptions.ConnectionError:
+        _reset_client()
+        return operation(_get_client())
 
 def check_docker_running() -> bool:
     """Check if Docker daemon is running"""
-    max_retries = 3
-    retry_delay = 2  # seconds
+    # Same ~4 s budget as the old three attempts 2 s apart, but polled with
+    # backoff so a daemon that is just coming up is seen straight away
+    return wait_for_docker(timeout=4)
+
+def _image_version_key(version):
+    """Sort key ordering image versions numerically (1.10.0 after 1.9.0)"""
+    try:
+        return (1, Version(version))
+    except InvalidVersion:
+        return (0, version)
+
+@functools.lru_cache(maxsize=1)
+def find_docker_image_tar():
+    """Find the bundled TAK Manager image tar and the image name it provides"""
+    # Find the image tar file using the resource path
+    image_dir = get_resource_path("docker")
     
-    for attempt in range(max_retries):
-        try:
-            client = docker.from_env()
-            client.ping()
-            return True
-        except docker.errors.DockerException:
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                continue
-            return False
+    # One directory read for both .tar and .tar.gz, keyed by version
+    tar_files = {}
+    try:
+        with os.scandir(image_dir) as entries:
+            for entry in entries:
+                match = _IMAGE_TAR_RE.match(entry.name)
+                if match and entry.is_file():
+                    tar_files[Path(entry.path)] = match.group(1)
+    except FileNotFoundError:
+        pass
+    
+    if not tar_files:
+        raise Exception("No TAK Manager image found in docker directory")
+    
+    # Use the latest version if multiple files exist, compared by version
+    # number rather than by extension
+    image_tar = max(tar_files, key=lambda f: _image_version_key(tar_files[f]))
+    return image_tar, f"tak-manager:{tar_files[image_tar]}"
+
+def _image_cache_path():
+    """File recording which tar each loaded image came from"""
+    return os.path.join(get_app_data_dir(), ".image_cache.json")
+
+def _read_image_cache() -> dict:
+    """Read the image name -> tar stamp records, empty if missing or corrupt"""
+    try:
+        with open(_image_cache_path(), 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _write_image_cache(cache: dict):
+    """Persist the image records, best effort"""
+    path = _image_cache_path()
+    try:
+        with open(path + ".tmp", 'w') as f:
+            json.dump(cache, f)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+@contextlib.contextmanager
+def _open_image_stream(image_tar):
+    """Open an image tar for loading, gunzipping through pigz when available"""
+    pigz = shutil.which('pigz') if image_tar.name.endswith('.gz') else None
+    if not pigz:
+        with open(image_tar, 'rb') as f:
+            yield f
+        return
+
+    # Decompress in a separate process so dockerd only ingests a plain tar
+    proc = subprocess.Popen(
+        [pigz, '-dc', str(image_tar)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        startupinfo=get_startupinfo()
+    )
+    try:
+        yield proc.stdout
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise docker.errors.ImageLoadError(f"pigz exited with status {returncode}")
 
 def find_and_load_docker_image():
     """Find and load the TAK Manager Docker image"""
     try:
-        # Find the image tar file using the resource path
-        image_dir = Path(get_resource_path("docker"))
-        
-        # Look for both .tar and .tar.gz extensions
-        tar_files = []
-        for ext in [".tar", ".tar.gz"]:
-            tar_files.extend(list(image_dir.glob(f"tak-manager-*{ext}")))
-        
-        if not tar_files:
-            raise Exception("No TAK Manager image found in docker directory")
-        
-        # Use the latest version if multiple files exist
-        # Sort by version number, not by extension
-        def get_version(file_path):
-            # Extract version from filename (tak-manager-1.0.0.tar.gz or tak-manager-1.0.0.tar -> 1.0.0)
-            version = file_path.stem.split('-')[-1]
-            if version.endswith('.tar'):  # Handle .tar extension in stem
-                version = version[:-4]
-            return version
-            
-        image_tar = sorted(tar_files, key=get_version)[-1]
-        
-        # Extract version, handling both .tar and .tar.gz cases
-        version = get_version(image_tar)
-        image_name = f"tak-manager:{version}"
+        image_tar, image_name = find_docker_image_tar()
+        if image_name in _loaded_images:
+            return True
+
+        # Size and mtime identify the tar well enough to tell a reinstall
+        # under the same tag apart without hashing hundreds of MB
+        st = image_tar.stat()
+        tar_stamp = f"{st.st_size}-{st.st_mtime_ns}"
+        cache = _read_image_cache()
         
         # Check if image already exists
-        client = docker.from_env()
         try:
-            client.images.get(image_name)
-            if not getattr(sys, 'frozen', False):
-                print(f"Docker image {image_name} already loaded")
-            return True
+            _retry_on_disconnect(lambda client: client.images.get(image_name))
+            exists = True
         except docker.errors.ImageNotFound:
+            exists = False
+        client = _get_client()
+
+        # An image without a record predates the cache, trust it as before
+        if exists and cache.get(image_name, tar_stamp) == tar_stamp:
+            logger.info("Docker image %s already loaded", image_name)
+        else:
             # Load Docker image from tar
-            if not getattr(sys, 'frozen', False):
-                print(f"Loading TAK Server Docker image {image_name} from {image_tar}...")
-            setup_environment()
-            docker_bin = get_docker_binary()
-            startupinfo = get_startupinfo()
-            load_result = subprocess.run(
-                [docker_bin, 'load', '-i', str(image_tar)],
-                capture_output=True,
-                text=True,
-                startupinfo=startupinfo
-            )
-            if load_result.returncode != 0:
-                raise Exception(f"Failed to load Docker image: {load_result.stderr}")
-            if not getattr(sys, 'frozen', False):
-                print("Docker image loaded successfully")
-            return True
+            logger.info("Loading TAK Server Docker image %s from %s...", image_name, image_tar)
+            # Stream the tar straight to the daemon. The low-level call skips
+            # images.load()'s per-image lookups.
+            try:
+                with _open_image_stream(image_tar) as f:
+                    for chunk in client.api.load_image(f, quiet=True):
+                        if 'error' in chunk:
+                            raise docker.errors.ImageLoadError(chunk['error'])
+            except (docker.errors.ImageLoadError, docker.errors.APIError) as e:
+                raise Exception(f"Failed to load Docker image: {e}")
+            logger.info("Docker image loaded successfully")
+
+        if cache.get(image_name) != tar_stamp:
+            cache[image_name] = tar_stamp
+            _write_image_cache(cache)
+        _loaded_images.add(image_name)
+        return True
             
     except Exception as e:
-        if not getattr(sys, 'frozen', False):
-            print(f"Error loading Docker image: {e}")
+        if isinstance(e, (docker.errors.DockerException, requests.exceptions.RequestException)):
+            _reset_client()
+        logger.error("Error loading Docker image: %s", e)
         return False
 
+def prefetch_docker_image():
+    """Start loading the bundled image in the background, once per process"""
+    global _prefetch_thread
+    with _prefetch_lock:
+        if _prefetch_thread is None:
+            _prefetch_thread = threading.Thread(
+                target=find_and_load_docker_image, name="image_prefetch", daemon=True
+            )
+            _prefetch_thread.start()
+
+def load_env_file(env_path: str) -> dict:
+    """Parse an .env file, reusing the previous result while it is unchanged"""
+    global _env_cache
+    mtime = os.stat(env_path).st_mtime_ns
+    if _env_cache is None or _env_cache[0] != mtime:
+        _env_cache = (mtime, parse_env_file(env_path))
+    return _env_cache[1]
+
+def _interpolate(value, env):
+    """Expand compose-style variable references in a string"""
+    def replace(match):
+        escaped, name, op, default, bare = match.groups()
+        if escaped:
+            return '$'
+        current = env.get(name or bare)
+        if op == ':-' and not current:
+            return default
+        if op == '-' and current is None:
+            return default
+        return current or ''
+    if '${' in _COMPOSE_VAR_RE.sub('', value):
+        raise ValueError(f"Unsupported variable syntax in {value!r}")
+    return _COMPOSE_VAR_RE.sub(replace, value)
+
+def _compose_project_name(compose_file, compose):
+    """Derive the compose project name the CLI would use"""
+    name = os.environ.get('COMPOSE_PROJECT_NAME') or compose.get('name')
+    if not name:
+        name = os.path.basename(os.path.dirname(os.path.abspath(compose_file)))
+    # Normalised like compose: container names must start alphanumeric, and
+    # onedir builds keep resources under '_internal'
+    return re.sub(r'[^a-z0-9_-]', '', name.lower()).lstrip('_-')
+
+def _read_compose(compose_file):
+    """Parse a compose file, reusing the previous parse while it is unchanged"""
+    mtime = os.stat(compose_file).st_mtime_ns
+    cached = _compose_cache.get(compose_file)
+    if cached is None or cached[0] != mtime:
+        with open(compose_file, 'r') as f:
+            cached = (mtime, yaml.safe_load(f) or {})
+        _compose_cache[compose_file] = cached
+    return cached[1]
+
+def load_compose_service(compose_file: str, env) -> dict:
+    """Translate the compose service into containers.run() keyword arguments
+
+    Returns None when the compose file uses features the translation does not
+    cover, in which case callers should go through the docker compose CLI.
+    """
+    try:
+        compose = _read_compose(compose_file)
+        service = compose.get('services', {}).get(COMPOSE_SERVICE)
+        if (not service or not set(compose) <= _SDK_TOP_LEVEL_KEYS
+                or not set(service) <= _SDK_SERVICE_KEYS or 'image' not in service):
+            return None
+
+        base_dir = os.path.dirname(os.path.abspath(compose_file))
+        project = _compose_project_name(compose_file, compose)
+        kwargs = {
+            'image': _interpolate(str(service['image']), env),
+            'name': _interpolate(
+                str(service.get('container_name', f"{project}-{COMPOSE_SERVICE}-1")), env
+            ),
+        }
+
+        environment = service.get('environment') or {}
+        if isinstance(environment, list):
+            environment = dict(item.split('=', 1) if '=' in item else (item, None)
+                               for item in environment)
+        kwargs['environment'] = {
+            key: _interpolate(str(value), env) if value is not None else env.get(key, '')
+            for key, value in environment.items()
+        }
+
+        ports = {}
+        for entry in service.get('ports') or []:
+            if not isinstance(entry, (str, int)):
+                return None
+            mapping, _, proto = _interpolate(str(entry), env).partition('/')
+            parts = mapping.split(':')
+            target = f"{parts[-1]}/{proto or 'tcp'}"
+            if len(parts) == 1:
+                ports[target] = None
+            elif len(parts) == 2:
+                ports[target] = int(parts[0])
+            else:
+                ports[target] = (parts[0], int(parts[1]))
+        kwargs['ports'] = ports
+
+        volumes = {}
+        for entry in service.get('volumes') or []:
+            match = _VOLUME_RE.match(_interpolate(entry, env)) if isinstance(entry, str) else None
+            if not match:
+                return None
+            source, target, mode = match.groups()
+            source = os.path.expanduser(source)
+            if not (source.startswith('.') or os.path.isabs(source)):
+                return None  # Named volumes need the compose project's volume setup
+            volumes[os.path.normpath(os.path.join(base_dir, source))] = {
+                'bind': target, 'mode': mode or 'rw'
+            }
+        kwargs['volumes'] = volumes
+
+        restart = service.get('restart')
+        if restart and restart != 'no':
+            policy, _, retries = str(restart).partition(':')
+            kwargs['restart_policy'] = {'Name': policy, 'MaximumRetryCount': int(retries or 0)}
+        for key in ('command', 'working_dir'):
+            if key in service:
+                value = service[key]
+                kwargs[key] = (_interpolate(value, env) if isinstance(value, str)
+                               else [_interpolate(str(v), env) for v in value])
+
+        # Labels let the compose CLI still recognise the container as its own
+        config_hash = hashlib.sha256(
+            json.dumps(kwargs, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        kwargs['labels'] = {
+            'com.docker.compose.project': project,
+            'com.docker.compose.service': COMPOSE_SERVICE,
+            'com.docker.compose.oneoff': 'False',
+            _CONFIG_HASH_LABEL: config_hash,
+        }
+        return kwargs
+    except (OSError, ValueError, TypeError, AttributeError, yaml.YAMLError) as e:
+        logger.info("Falling back to docker compose CLI: %s", e)
+        return None
+
+def run_service_container(spec: dict):
+    """Create and start the service container through the Docker API"""
+    try:
+        existing = _retry_on_disconnect(lambda client: client.containers.get(spec['name']))
+        # The tag in the hash can stay the same while a newer tar was loaded
+        # under it, so compare the image the container runs as well
+        if (existing.status == 'running'
+                and existing.labels.get(_CONFIG_HASH_LABEL) == spec['labels'][_CONFIG_HASH_LABEL]
+                and existing.attrs.get('Image') == _get_client().images.get(spec['image']).id):
+            return
+        # Configuration or image changed, or container is stopped, recreate like compose does
+        existing.remove(force=True)
+    except docker.errors.NotFound:
+        pass
+    _get_client().containers.run(detach=True, **spec)
+
+def _compose_context(compose_file: str):
+    """Resolve the compose file and the environment it is rendered with
+
+    Start and stop both go through here so they always agree on the
+    container name and project the compose file interpolates to.
+    """
+    global _DIRS_READY
+    # Get the correct compose file path using get_resource_path
+    compose_file = COMPOSE_FILE_PATH if compose_file == COMPOSE_FILE else get_resource_path(compose_file)
+    logger.debug("Using compose file: %s", compose_file)
+
+    # Get data directory and ensure it exists with proper permissions
+    data_dir = get_app_data_dir()
+
+    # Ensure all required directories exist, once per process
+    if not _DIRS_READY:
+        ensure_dir(data_dir)
+        _DIRS_READY = True
+
+    # Copy .env file to data directory if it doesn't exist
+    env_dest = os.path.join(data_dir, ".env")
+    if not os.path.exists(env_dest):
+        shutil.copy2(ENV_SRC_PATH, env_dest)
+        # Ensure env file has proper permissions
+        os.chmod(env_dest, 0o644)
+
+    # Load environment variables from the persistent env file
+    file_vars = load_env_file(env_dest)
+
+    # Layered lookup with absolute paths over the env file over our own
+    # environment; only the CLI path needs it flattened into a real dict
+    env_vars = collections.ChainMap({'TAK_MANAGER_DATA_DIR': data_dir}, file_vars, os.environ)
+    return compose_file, data_dir, env_vars
+
 def start_container(compose_file: str) -> dict:
     """Start the TAK Manager container"""
+    global _container_started
     try:
         setup_environment()
         docker_bin = get_docker_binary()
         
-        # First ensure the Docker image is loaded
+        # First ensure the Docker image is loaded. A prefetch usually has it
+        # done already; if that failed the call below retries the load.
+        if _prefetch_thread is not None:
+            _prefetch_thread.join()
         if not find_and_load_docker_image():
             return {"success": False, "error": "Failed to load Docker image. Ensure Docker is installed and running."}
 
-        # Get the correct compose file path using get_resource_path
-        compose_file = get_resource_path(compose_file)
-        if not getattr(sys, 'frozen', False):
-            print(f"Using compose file: {compose_file}")
-        
-        # Get data directory and ensure it exists with proper permissions
-        data_dir = get_app_data_dir()
-        
-        # Ensure all required directories exist
-        for directory in [data_dir]:
-            os.makedirs(directory, exist_ok=True)
-            # Ensure directory has proper permissions (read/write for user)
-            os.chmod(directory, 0o755)
-
-        # Copy .env file to data directory if it doesn't exist
-        env_src = get_resource_path(".env")
-        env_dest = os.path.join(data_dir, ".env")
-        if not os.path.exists(env_dest):
-            import shutil
-            shutil.copy2(env_src, env_dest)
-            # Ensure env file has proper permissions
-            os.chmod(env_dest, 0o644)
-
-        # Load environment variables from the persistent env file
-        with open(env_dest, 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    os.environ[key] = value
-
-        # Prepare environment with absolute paths
-        env_vars = {
-            **os.environ,
-            'TAK_MANAGER_DATA_DIR': data_dir,
-        }
+        compose_file, data_dir, env_vars = _compose_context(compose_file)
+        logger.info("Starting TAK Server container with data dir: %s", data_dir)
 
-        # Start container using docker compose
-        if not getattr(sys, 'frozen', False):
-            print(f"Starting TAK Server container with data dir: {data_dir}")
-        
-        startupinfo = get_startupinfo()
-        result = subprocess.run(
-            [docker_bin, 'compose', '-f', compose_file, 'up', 'prod', '-d'],
-            capture_output=True,
-            text=True,
-            env=env_vars,
-            startupinfo=startupinfo
-        )
-        if result.returncode != 0:
-            if not getattr(sys, 'frozen', False):
-                print(f"Docker compose error: {result.stderr}")
-            return {"success": False, "error": result.stderr}
-
-        port = os.environ.get("BACKEND_PORT", "")
+        port = env_vars.get("BACKEND_PORT", "")
         if not port:
             return {"success": False, "error": "No backend port specified"}
 
-        return {"success": True, "port": port}
+        # Talk to the daemon directly when the compose file allows it
+        proc = None
+        spec = load_compose_service(compose_file, env_vars)
+        if spec is not None:
+            try:
+                run_service_container(spec)
+            except docker.errors.APIError as e:
+                # The daemon rejected our rendering of the service, let
+                # compose itself have a go
+                logger.info("Falling back to docker compose CLI: %s", e)
+                spec = None
+        if spec is None:
+            # Don't block on compose here, callers overlap other work with it
+            # and collect the outcome via wait_container_ready()
+            proc = subprocess.Popen(
+                [docker_bin, 'compose', '-f', compose_file, 'up', COMPOSE_SERVICE, '-d'],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                env=dict(env_vars),
+                startupinfo=get_startupinfo()
+            )
+
+        _container_started = True
+
+        return {"success": True, "port": port, "proc": proc}
     except Exception as e:
-        if not getattr(sys, 'frozen', False):
-            print(f"Error in start_container: {str(e)}")
+        logger.error("Error in start_container: %s", e)
         return {"success": False, "error": str(e)}
 
+def wait_container_ready(proc, timeout: float = 300) -> dict:
+    """Wait for a compose launch returned by start_container to finish"""
+    if proc is None:
+        return {"success": True}
+    try:
+        _, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        return {"success": False, "error": "Timed out starting the container"}
+    if proc.returncode != 0:
+        logger.error("Docker compose error: %s", stderr)
+        return {"success": False, "error": stderr}
+    return {"success": True}
+
+def ensure_dir(path, mode=0o755):
+    """Create a directory if needed, chmodding it only when its mode differs"""
+    try:
+        current = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+        current = None
+    # chmod can't express these permissions on Windows
+    if os.name != 'nt' and current != mode:
+        try:
+            os.chmod(path, mode)
+        except OSError:
+            pass
+
+def is_container_started() -> bool:
+    """Check whether this process started the container and hasn't stopped it"""
+    return _container_started
+
 def stop_container(compose_file: str) -> dict:
     """Stop the TAK Manager container"""
+    global _container_started
     try:
         setup_environment()
         docker_bin = get_docker_binary()
         
-        # Convert compose_file path to use correct path separators for the OS
-        compose_file = str(Path(compose_file))
-        
+        compose_file, _, env_vars = _compose_context(compose_file)
+
+        spec = load_compose_service(compose_file, env_vars)
+        if spec is not None:
+            try:
+                container = _retry_on_disconnect(
+                    lambda client: client.containers.get(spec['name'])
+                )
+                container.stop(timeout=10)
+                container.remove()
+            except docker.errors.NotFound:
+                pass
+            except (docker.errors.DockerException, requests.exceptions.RequestException):
+                _reset_client()
+                raise
+            _container_started = False
+            return {"success": True}
+
         startupinfo = get_startupinfo()
         result = subprocess.run(
             [docker_bin, 'compose', '-f', compose_file, 'down'],
             capture_output=True,
             text=True,
+            env=dict(env_vars),
             startupinfo=startupinfo
         )
         if result.returncode != 0:
             return {"success": False, "error": result.stderr}
+        _container_started = False
         return {"success": True}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@functools.lru_cache(maxsize=1)
 def get_app_data_dir():
     """Get the application data directory"""
-    system = platform.system().lower()
-    if system == "darwin":  # macOS
+    if _IS_MAC:  # macOS
         data_dir = os.path.expanduser("~/Library/Application Support/TAK-Manager")
-    elif system == "windows":  # Windows
+    elif _IS_WIN:  # Windows
         data_dir = os.path.join(os.getenv("APPDATA"), "TAK-Manager")
     else:  # Linux
         data_dir = os.path.expanduser("~/.tak-manager")
@@ -1,13 +1,82 @@
+import functools
+import mmap
 import os
 import subprocess
 import platform
+import re
+import shutil
+import sys
 from pathlib import Path
+from typing import Final
+
+# Host platform, fixed for the life of the process
+_SYSTEM: Final = platform.system().lower()
+_IS_MAC: Final = _SYSTEM == "darwin"
+_IS_WIN: Final = _SYSTEM == "windows"
+
+# KEY=value assignments in an .env file; blank and comment lines never match
+_ENV_RE = re.compile(rb'(?m)^[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t]*\r?$')
+
+# Trailing " # comment" on an unquoted value, as compose and dotenv read it
+_ENV_COMMENT_RE = re.compile(rb'[ \t]+#.*')
+
+# Double-quoted value up to its first unescaped closing quote
+_ENV_DQUOTED_RE = re.compile(rb'"((?:[^"\\]|\\.)*)"')
+
+# Backslash escapes _format_env_value writes inside double quotes
+_ENV_ESCAPE_RE = re.compile(rb'\\(["\\])')
+
+# Values that have to be quoted to read back unchanged
+_ENV_NEEDS_QUOTES_RE = re.compile(r'[\s#"\']')
+
+# Start of a KEY= assignment line, used when rewriting keys in place
+_ENV_KEY_RE = re.compile(rb'[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_]*)[ \t]*=')
+
+# .env files above this size are scanned through mmap instead of read()
+_ENV_MMAP_THRESHOLD = 64 * 1024
+
+# Keys load_config reports
+CONFIG_KEYS = ("TAK_SERVER_INSTALL_DIR", "BACKEND_PORT")
+
+def _select_directory_in_window():
+    """Ask the app's own pywebview window for a folder
+
+    Returns None when no window runs in this process (the dev API server is a
+    separate process), so callers fall back to an external picker.
+    """
+    webview = sys.modules.get('webview')
+    if webview is None or not webview.windows:
+        return None
+    result = webview.windows[0].create_file_dialog(dialog_type=webview.FOLDER_DIALOG)
+    return result[0] if result else ""
+
+# Linux folder pickers in order of preference
+_LINUX_PICKERS = (
+    # zenity is common on GNOME
+    ['zenity', '--file-selection', '--directory', '--title=Select TAK Server Installation Directory'],
+    # kdialog on KDE
+    ['kdialog', '--getexistingdirectory', 'Select TAK Server Installation Directory'],
+    ['yad', '--file', '--directory', '--title=Select TAK Server Installation Directory'],
+)
+
+@functools.lru_cache(maxsize=1)
+def _linux_picker():
+    """Find the first installed Linux folder picker, once per process"""
+    return next((argv for argv in _LINUX_PICKERS if shutil.which(argv[0])), None)
 
 def select_directory():
     """Open the native file explorer and return selected path"""
-    system = platform.system().lower()
-    
-    if system == "darwin":  # macOS
+    # The window's native dialog opens in-process, without starting a
+    # scripting host; tkinter isn't an option as it can't share the GUI
+    # thread pywebview owns
+    try:
+        selected = _select_directory_in_window()
+        if selected is not None:
+            return selected
+    except Exception as e:
+        print(f"Error selecting directory: {e}")
+
+    if _IS_MAC:  # macOS
         script = '''
         tell application "System Events"
             activate
@@ -24,7 +93,7 @@ def select_directory():
         except Exception as e:
             print(f"Error selecting directory: {e}")
             
-    elif system == "windows":  # Windows
+    elif _IS_WIN:  # Windows
         powershell_script = '''
         Add-Type -AssemblyName System.Windows.Forms
         $folderBrowser = New-Object System.Windows.Forms.FolderBrowserDialog
@@ -46,153 +115,141 @@ def select_directory():
             print(f"Error selecting directory: {e}")
             
     else:  # Linux
-        # Try zenity first (common on GNOME)
+        picker = _linux_picker()
+        if picker is None:
+            print("No supported file dialog found. Please install zenity, kdialog, or yad.")
+            return ""
         try:
-            result = subprocess.run(
-                ['zenity', '--file-selection', '--directory', 
-                 '--title=Select TAK Server Installation Directory'],
-                capture_output=True,
-                text=True
-            )
+            result = subprocess.run(picker, capture_output=True, text=True)
             if result.returncode == 0:
                 return result.stdout.strip()
-        except FileNotFoundError:
-            # If zenity not found, try kdialog (KDE)
-            try:
-                result = subprocess.run(
-                    ['kdialog', '--getexistingdirectory', 
-                     'Select TAK Server Installation Directory'],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip()
-            except FileNotFoundError:
-                # If neither found, try yad (another common option)
-                try:
-                    result = subprocess.run(
-                        ['yad', '--file', '--directory',
-                         '--title=Select TAK Server Installation Directory'],
-                        capture_output=True,
-                        text=True
-                    )
-                    if result.returncode == 0:
-                        return result.stdout.strip()
-                except FileNotFoundError:
-                    print("No supported file dialog found. Please install zenity, kdialog, or yad.")
-                except Exception as e:
-                    print(f"Error selecting directory: {e}")
+        except Exception as e:
+            print(f"Error selecting directory: {e}")
     
     return ""
 
+@functools.lru_cache(maxsize=1)
 def get_app_config_dir() -> Path:
     """Get the appropriate config directory for the current OS"""
-    system = platform.system().lower()
-    
-    if system == "darwin":  # macOS
+    if _IS_MAC:  # macOS
         return Path.home() / "Library" / "Application Support" / "TAK-Manager"
-    elif system == "windows":  # Windows
+    elif _IS_WIN:  # Windows
         return Path(os.getenv('APPDATA', str(Path.home() / 'AppData' / 'Roaming'))) / "TAK-Manager"
     else:  # Linux
         return Path.home() / ".config" / "tak-manager"
 
-def load_config() -> dict:
+# .env files holding the configuration, in lookup order: the packaged file
+# beside this script, then the OS-specific app config directory
+PACKAGED_ENV_PATH = Path(__file__).parent / '.env'
+LOCAL_ENV_PATH = get_app_config_dir() / '.env'
+CONFIG_LOCATIONS = (PACKAGED_ENV_PATH, LOCAL_ENV_PATH)
+
+def parse_env_file(path) -> dict:
+    """Parse KEY=value lines of an .env file, stripping quotes and inline comments"""
+    env = {}
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return env  # mmap can't map an empty file
+        # Small files are cheaper to read outright; large ones are scanned
+        # in place without copying them into memory
+        if size > _ENV_MMAP_THRESHOLD:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+        try:
+            for match in _ENV_RE.finditer(data):
+                key, value = match.groups()
+                quote = value[:1]
+                # Anything after the closing quote is a comment
+                if quote == b'"':
+                    quoted = _ENV_DQUOTED_RE.match(value)
+                    if quoted:
+                        value = _ENV_ESCAPE_RE.sub(rb'\1', quoted.group(1))
+                elif quote == b"'":
+                    end = value.find(quote, 1)
+                    if end > 0:
+                        value = value[1:end]
+                else:
+                    value = _ENV_COMMENT_RE.sub(b'', value)
+                # Only matched pairs are decoded; stray bytes can't fail the parse
+                env[key.decode()] = value.decode('utf-8', errors='replace')
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+    return env
+
+def load_config(locations=CONFIG_LOCATIONS) -> dict:
     """Load configuration from .env files
-    
-    Checks in the following order:
-    1. Packaged .env file in the same directory as this script
-    2. Local system .env file in the OS-specific app config directory
+
+    The first location providing any configured value wins.
     """
-    config = {"TAK_SERVER_INSTALL_DIR": "", "BACKEND_PORT": ""}
+    config = {key: "" for key in CONFIG_KEYS}
     
     try:
-        # First check packaged env file
-        packaged_env_path = Path(__file__).parent / '.env'
-        if packaged_env_path.exists():
-            with open(packaged_env_path, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        key, value = line.strip().split('=', 1)
-                        if key in ['TAK_SERVER_INSTALL_DIR', 'BACKEND_PORT']:
-                            config[key] = value
-        
-        # If packaged env is empty, check local system env file
-        if not any(config.values()):
-            local_env_path = get_app_config_dir() / '.env'
-            if local_env_path.exists():
-                with open(local_env_path, 'r') as f:
-                    for line in f:
-                        if line.strip() and not line.startswith('#'):
-                            key, value = line.strip().split('=', 1)
-                            if key in ['TAK_SERVER_INSTALL_DIR', 'BACKEND_PORT']:
-                                config[key] = value
+        for env_path in locations:
+            if env_path.exists():
+                env = parse_env_file(env_path)
+                config.update((key, env[key]) for key in CONFIG_KEYS if key in env)
+                if any(config.values()):
+                    break
 
         return config
     except Exception as e:
         print(f"Error loading configuration: {e}")
-        return {"TAK_SERVER_INSTALL_DIR": "", "BACKEND_PORT": ""}
+        return {key: "" for key in CONFIG_KEYS}
+
+def _format_env_value(value) -> str:
+    """Quote a value when needed so parse_env_file reads it back unchanged"""
+    value = str(value)
+    if not _ENV_NEEDS_QUOTES_RE.search(value):
+        return value
+    # Single quotes are taken literally, so prefer them when possible
+    if "'" not in value:
+        return f"'{value}'"
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _update_env_file(path: Path, updates: dict):
+    """Set keys in an .env file in one pass, keeping every other line as is"""
+    try:
+        lines = path.read_bytes().splitlines(keepends=True)
+    except FileNotFoundError:
+        lines = []
+
+    seen = set()
+    for i, line in enumerate(lines):
+        match = _ENV_KEY_RE.match(line)
+        key = match.group(1).decode() if match else None
+        if key in updates:
+            lines[i] = f"{key}={_format_env_value(updates[key])}\n".encode()
+            seen.add(key)
+    if lines and not lines[-1].endswith(b'\n'):
+        lines[-1] += b'\n'
+    lines += [f"{key}={_format_env_value(value)}\n".encode() for key, value in updates.items() if key not in seen]
+
+    # Write beside the target and swap it in so readers never see a partial file
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(b''.join(lines))
+    os.replace(tmp_path, path)
 
 def save_config(install_dir: str, port: str) -> bool:
     """Update both the packaged and local system .env files with new configuration"""
     try:
+        updates = {'BACKEND_PORT': port, 'TAK_SERVER_INSTALL_DIR': install_dir}
+
         # Save to packaged env file
-        packaged_env_path = Path(__file__).parent / '.env'
-        if packaged_env_path.exists():
-            with open(packaged_env_path, 'r') as f:
-                lines = f.readlines()
-
-            new_lines = []
-            for line in lines:
-                if line.startswith('BACKEND_PORT='):
-                    new_lines.append(f'BACKEND_PORT={port}\n')
-                elif line.startswith('TAK_SERVER_INSTALL_DIR='):
-                    new_lines.append(f'TAK_SERVER_INSTALL_DIR={install_dir}\n')
-                else:
-                    new_lines.append(line)
-
-            with open(packaged_env_path, 'w') as f:
-                f.writelines(new_lines)
-
-        # Save to local system env file
-        config_dir = get_app_config_dir()
-        config_dir.mkdir(parents=True, exist_ok=True)
-        local_env_path = config_dir / '.env'
-        
-        # Create or update local env file
-        if not local_env_path.exists():
-            env_content = f"""BACKEND_PORT={port}
-TAK_SERVER_INSTALL_DIR={install_dir}
-"""
-            with open(local_env_path, 'w') as f:
-                f.write(env_content)
-        else:
-            with open(local_env_path, 'r') as f:
-                lines = f.readlines()
-
-            new_lines = []
-            found_port = False
-            found_install_dir = False
-            for line in lines:
-                if line.startswith('BACKEND_PORT='):
-                    new_lines.append(f'BACKEND_PORT={port}\n')
-                    found_port = True
-                elif line.startswith('TAK_SERVER_INSTALL_DIR='):
-                    new_lines.append(f'TAK_SERVER_INSTALL_DIR={install_dir}\n')
-                    found_install_dir = True
-                else:
-                    new_lines.append(line)
-            
-            if not found_port:
-                new_lines.append(f'BACKEND_PORT={port}\n')
-            if not found_install_dir:
-                new_lines.append(f'TAK_SERVER_INSTALL_DIR={install_dir}\n')
+        if PACKAGED_ENV_PATH.exists():
+            _update_env_file(PACKAGED_ENV_PATH, updates)
 
-            with open(local_env_path, 'w') as f:
-                f.writelines(new_lines)
+        # Create or update local system env file
+        LOCAL_ENV_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _update_env_file(LOCAL_ENV_PATH, updates)
 
-        # Update environment variables
-        os.environ['BACKEND_PORT'] = port
-        os.environ['TAK_SERVER_INSTALL_DIR'] = install_dir
+        # Update environment variables, skipping the putenv round-trip for
+        # values that haven't changed
+        for key, value in updates.items():
+            if os.environ.get(key) != value:
+                os.environ[key] = value
 
         return True
     except Exception as e:
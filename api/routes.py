@@ -1,26 +1,35 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+import asyncio
 import webbrowser
 from api.handlers.path_handler import select_directory, save_config as save_config_file, load_config
 from api.handlers.docker_handler import (
     check_docker_installed,
     check_docker_running,
     start_docker_desktop,
+    prefetch_docker_image,
     start_container,
-    stop_container
+    wait_container_ready,
+    stop_container,
+    COMPOSE_FILE
 )
 from api.handlers.port_checker import check_port_availability
 import requests
 from packaging import version
-import os
 import json
-import socket
-import subprocess
-import platform
+import time
 from pathlib import Path
 
 router = APIRouter()
-compose_file = "docker-compose.yml"
+compose_file = COMPOSE_FILE
+
+UPDATE_URL = 'https://api.github.com/repos/JShadowNull/TAK-Manager/releases/latest'
+UPDATE_CACHE_TTL = 300  # seconds
+
+# Reused across update checks so the GitHub connection is kept alive
+_update_session = requests.Session()
+_update_cache = None  # (timestamp, result) of the last successful check
+_update_lock = asyncio.Lock()
 
 class ConfigData(BaseModel):
     install_dir: str
@@ -41,28 +50,38 @@ async def open_external_url(data: UrlData):
 @router.get("/check-docker-installed")
 async def check_docker_installed_route():
     """Check if Docker is installed"""
-    return {"installed": check_docker_installed()}
+    return {"installed": await asyncio.to_thread(check_docker_installed)}
 
 @router.get("/check-docker-running")
 async def check_docker_running_route():
     """Check if Docker daemon is running and try to start it if not"""
-    if check_docker_running():
-        return {"running": True}
-    
-    # Try to start Docker Desktop
-    start_docker_desktop()
-    return {"running": check_docker_running()}
+    running = await asyncio.to_thread(check_docker_running)
+    if not running:
+        # Try to start Docker Desktop
+        await asyncio.to_thread(start_docker_desktop)
+        running = await asyncio.to_thread(check_docker_running)
+
+    if running:
+        # Load the image while the user is still on the setup screens, so
+        # starting the container doesn't wait for it
+        prefetch_docker_image()
+    return {"running": running}
 
 @router.post("/start-container")
 async def start_container_route():
     """Start the TAK Manager container"""
-    result = start_container(compose_file)
+    # Docker calls block for seconds, keep them off the event loop
+    result = await asyncio.to_thread(start_container, compose_file)
     if not result["success"]:
         raise HTTPException(status_code=500, detail=result["error"])
     
-    # Get port from environment
+    # Get port from environment while compose is still bringing the container up
     config = load_config()
     port = config.get("BACKEND_PORT")
+
+    ready = await asyncio.to_thread(wait_container_ready, result["proc"])
+    if not ready["success"]:
+        raise HTTPException(status_code=500, detail=ready["error"])
     if not port:
         raise HTTPException(status_code=500, detail="No backend port specified")
     
@@ -71,7 +90,7 @@ async def start_container_route():
 @router.post("/stop-container")
 async def stop_container_route():
     """Stop the TAK Manager container"""
-    result = stop_container(compose_file)
+    result = await asyncio.to_thread(stop_container, compose_file)
     if not result["success"]:
         raise HTTPException(status_code=500, detail=result["error"])
     return result
@@ -92,7 +111,7 @@ async def save_config(config: ConfigData):
 async def select_directory_route():
     """Select directory using native file picker"""
     try:
-        path = select_directory()
+        path = await asyncio.to_thread(select_directory)
         return {"path": path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -100,35 +119,40 @@ async def select_directory_route():
 @router.get("/check-port/{port}")
 async def check_port(port: int):
     """Check if a port is available for use."""
-    is_available, message = check_port_availability(port)
+    is_available, message = await asyncio.to_thread(check_port_availability, port)
     return {"available": is_available, "message": message}
 
-def get_current_version():
-    """Get current version from version.txt"""
+_VERSION_FILE = Path(__file__).parent.parent / 'version.txt'
+
+def _read_current_version():
+    """Read the current version from version.txt"""
     try:
-        version_file = Path(__file__).parent.parent / 'version.txt'
-        if version_file.exists():
-            version = version_file.read_text().strip()
-            if version.startswith('v'):
-                version = version[1:]
-            return version
+        version = _VERSION_FILE.read_text(encoding='utf-8').strip()
+        if version.startswith('v'):
+            version = version[1:]
+        return version
+    except FileNotFoundError:
+        pass
     except Exception as e:
         print(f"Error reading version file: {e}")
     return '1.0.0'  # Fallback version
 
-@router.get("/check-update")
-async def check_update():
-    """Check for updates from GitHub repository"""
+# version.txt ships with the build and can't change while we run
+_CURRENT_VERSION = _read_current_version()
+
+def get_current_version():
+    """Get current version from version.txt"""
+    return _CURRENT_VERSION
+
+def fetch_update_info():
+    """Fetch the latest release from GitHub and compare it to the current version"""
     try:
         # Get current version from version.txt
         current_version = get_current_version()
 
         try:
             # Fetch latest release from GitHub API
-            response = requests.get(
-                'https://api.github.com/repos/JShadowNull/TAK-Manager/releases/latest',
-                timeout=10
-            )
+            response = _update_session.get(UPDATE_URL, timeout=10)
             response.raise_for_status()
             
             latest_release = response.json()
@@ -184,27 +208,37 @@ async def check_update():
             "release_notes": ""
         }
 
-def check_network_connectivity():
-    """Check if we can reach the GitHub server"""
-    host = "github.com"
+@router.get("/check-update")
+async def check_update():
+    """Check for updates from GitHub repository"""
+    global _update_cache
+    async with _update_lock:
+        if _update_cache and time.monotonic() - _update_cache[0] < UPDATE_CACHE_TTL:
+            return _update_cache[1]
+
+        result = await asyncio.to_thread(fetch_update_info)
+        # Only cache successful lookups so transient failures are retried
+        if "error" not in result:
+            _update_cache = (time.monotonic(), result)
+        return result
+
+async def check_network_connectivity():
+    """Check if we can reach the GitHub API server"""
     try:
-        # Try DNS resolution first
-        socket.gethostbyname(host)
-        
-        # Use platform-specific ping command
-        system = platform.system().lower()
-        if system == "windows":
-            ping_cmd = ["ping", "-n", "1", "-w", "1000", host]
-        else:  # macOS or Linux
-            ping_cmd = ["ping", "-c", "1", "-W", "1", host]
-            
-        result = subprocess.run(ping_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return result.returncode == 0
-    except:
+        # A TCP handshake with the update server is what we actually need,
+        # and unlike ping it isn't blocked on networks that drop ICMP
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection("api.github.com", 443),
+            timeout=2.0
+        )
+        writer.close()
+        await writer.wait_closed()
+        return True
+    except (OSError, asyncio.TimeoutError):
         return False
 
 @router.get("/check-network")
 async def check_network():
     """Check if network connection to update server is available"""
-    is_connected = check_network_connectivity()
-    return {"connected": is_connected} 
\ No newline at end of file
+    is_connected = await check_network_connectivity()
+    return {"connected": is_connected}
@@ -1,21 +1,186 @@
+import array
+import asyncio
+import base64
+import contextlib
+import logging
 import os
+import re
 import sys
 import uvicorn
-import webview
 import subprocess
 import signal
 import atexit
 import time
 import requests
-import psutil
+from requests.adapters import HTTPAdapter
+import socket
 from pathlib import Path
-from api.handlers.docker_handler import stop_container, get_resource_path
+from urllib.parse import urlsplit
+from api.handlers.docker_handler import stop_container, get_resource_path, is_container_started
 from api import create_app
 import threading
 
 # Add Windows-specific imports at the top
 if sys.platform == 'win32':
     import ctypes
+    from ctypes import wintypes
+
+    class _IoCounters(ctypes.Structure):
+        _fields_ = [(name, ctypes.c_ulonglong) for name in (
+            'ReadOperationCount', 'WriteOperationCount', 'OtherOperationCount',
+            'ReadTransferCount', 'WriteTransferCount', 'OtherTransferCount'
+        )]
+
+    class _JobBasicLimits(ctypes.Structure):
+        _fields_ = [
+            ('PerProcessUserTimeLimit', wintypes.LARGE_INTEGER),
+            ('PerJobUserTimeLimit', wintypes.LARGE_INTEGER),
+            ('LimitFlags', wintypes.DWORD),
+            ('MinimumWorkingSetSize', ctypes.c_size_t),
+            ('MaximumWorkingSetSize', ctypes.c_size_t),
+            ('ActiveProcessLimit', wintypes.DWORD),
+            ('Affinity', ctypes.c_size_t),
+            ('PriorityClass', wintypes.DWORD),
+            ('SchedulingClass', wintypes.DWORD),
+        ]
+
+    class _JobExtendedLimits(ctypes.Structure):
+        _fields_ = [
+            ('BasicLimitInformation', _JobBasicLimits),
+            ('IoInfo', _IoCounters),
+            ('ProcessMemoryLimit', ctypes.c_size_t),
+            ('JobMemoryLimit', ctypes.c_size_t),
+            ('PeakProcessMemoryUsed', ctypes.c_size_t),
+            ('PeakJobMemoryUsed', ctypes.c_size_t),
+        ]
+
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+    _kernel32.CreateJobObjectW.argtypes = (wintypes.LPVOID, wintypes.LPCWSTR)
+    _kernel32.SetInformationJobObject.argtypes = (
+        wintypes.HANDLE, ctypes.c_int, wintypes.LPVOID, wintypes.DWORD
+    )
+    _kernel32.AssignProcessToJobObject.argtypes = (wintypes.HANDLE, wintypes.HANDLE)
+    _kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    _JOB_OBJECT_EXTENDED_LIMIT_INFORMATION = 9
+    _JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE = 0x2000
+
+def _create_kill_on_close_job():
+    """Create a Windows job that kills every process in it once its handle closes"""
+    job = _kernel32.CreateJobObjectW(None, None)
+    if not job:
+        return None
+    limits = _JobExtendedLimits()
+    limits.BasicLimitInformation.LimitFlags = _JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+    if not _kernel32.SetInformationJobObject(
+        job, _JOB_OBJECT_EXTENDED_LIMIT_INFORMATION,
+        ctypes.byref(limits), ctypes.sizeof(limits)
+    ):
+        _kernel32.CloseHandle(job)
+        return None
+    return job
+
+# Arguments injected by PyInstaller bundles that argparse shouldn't see
+_PYI_ARG_RE = re.compile(r'_internal|Frameworks')
+
+# Signals that shut the app down. Where supported they are blocked in every
+# thread and collected by a dedicated sigwait() thread instead of a handler.
+_SHUTDOWN_SIGNALS = {signal.SIGINT, signal.SIGTERM}
+_USE_SIGWAIT = hasattr(signal, 'pthread_sigmask')
+
+@contextlib.contextmanager
+def _signals_unblocked():
+    """Spawn children inside this block so they don't inherit our signal mask"""
+    if not _USE_SIGWAIT:
+        yield
+        return
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, _SHUTDOWN_SIGNALS)
+    try:
+        yield
+    finally:
+        signal.pthread_sigmask(signal.SIG_BLOCK, _SHUTDOWN_SIGNALS)
+
+def _spawn(cmd, cwd=None):
+    """Start a child process in its own session, detached from our stdin"""
+    # stdout/stderr stay inherited so Vite/uvicorn/npm output remains visible
+    with _signals_unblocked():
+        return subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            close_fds=True,
+            start_new_session=True
+        )
+
+# Bundled resource locations don't change while the process runs
+_COMPOSE_FILE = Path(get_resource_path("docker-compose.yml"))
+_WEB_DIR = Path(get_resource_path("web"))
+NPM_CMD = 'npm.cmd' if sys.platform == 'win32' else 'npm'
+
+# Slice size used when writing int-list payloads from the JS bridge
+_SAVE_CHUNK = 1024 * 1024
+
+def _write_all(fd, buf):
+    """Write a whole buffer to a raw file descriptor"""
+    view = memoryview(buf)
+    while view:
+        view = view[os.write(fd, view):]
+
+# Shared by readiness probes so connections are reused between attempts.
+# At most the frontend and backend are probed concurrently.
+_probe_session = requests.Session()
+_probe_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+def _probe(url):
+    """Return the HTTP status of url without reading a response body"""
+    response = _probe_session.head(url, timeout=0.5, allow_redirects=False)
+    if response.status_code in (405, 501):
+        # Server doesn't do HEAD, fall back to GET but never read the body
+        with _probe_session.get(url, timeout=0.5, stream=True, allow_redirects=False) as response:
+            pass
+    return response.status_code
+
+def _port_open(host, port, timeout=0.2):
+    """Check whether something is accepting TCP connections on host:port"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+async def _probe_async(url, timeout=30):
+    """Poll a plain-HTTP url until it answers with a non-5xx status"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = 0.025
+    parts = urlsplit(url)
+    request = (
+        f"HEAD {parts.path or '/'} HTTP/1.1\r\n"
+        f"Host: {parts.netloc}\r\nConnection: close\r\n\r\n"
+    ).encode()
+    while loop.time() < deadline:
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(parts.hostname, parts.port or 80), 0.5
+            )
+            try:
+                # Only the status line matters, the rest is never read
+                writer.write(request)
+                status_line = await asyncio.wait_for(reader.readline(), 0.5)
+            finally:
+                writer.close()
+            if int(status_line.split()[1]) < 500:
+                return True
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            pass
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.7, 0.5)
+    return False
+
+async def _probe_all(*urls, timeout=30):
+    """Poll several servers concurrently, returning one result per url"""
+    return await asyncio.gather(*(_probe_async(url, timeout) for url in urls))
 
 class Api:
     def __init__(self, app):
@@ -32,17 +197,19 @@ class Api:
 
     def navigate(self, url):
         """Alternative single-window approach"""
-        def load_new_url():
-            time.sleep(1)  # Wait for server
-            try:
-                self.window.load_url(url)
-            except Exception as e:
-                print(f"Navigation failed: {e}")
-
-        threading.Thread(target=load_new_url).start()
+        # pywebview already runs js_api calls on their own thread, so waiting
+        # here doesn't block the GUI. Wait for the server to answer rather
+        # than a fixed delay, and load regardless afterwards so the page can
+        # show its own error.
+        self.app.wait_for_server(url, timeout=10)
+        try:
+            self.window.load_url(url)
+        except Exception as e:
+            print(f"Navigation failed: {e}")
 
     def save_file_dialog(self, filename, file_types):
         """Convert tuple pairs to pywebview's expected format"""
+        import webview
         # Convert [("Type", "ext"), ...] to ["Type (*.ext)", ...]
         converted_types = [f"{desc} (*.{ext})" for desc, ext in file_types]
         
@@ -54,47 +221,95 @@ class Api:
         )
 
     def write_binary_file(self, path, data):
-        with open(path, 'wb') as f:
-            f.write(bytes(data))
+        """Write bytes from the JS bridge to disk, sent as base64 or a list of ints"""
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            if isinstance(data, str):
+                _write_all(fd, base64.b64decode(data))
+            else:
+                # Convert the int list a slice at a time (array's C fast path
+                # beats bytes()) so a second full copy is never held in memory
+                for start in range(0, len(data), _SAVE_CHUNK):
+                    _write_all(fd, array.array('B', data[start:start + _SAVE_CHUNK]))
+        finally:
+            os.close(fd)
 
 class TakManagerApp:
     def __init__(self, dev_mode=False, api_port=8000):
-        self.compose_file = str(Path(get_resource_path("docker-compose.yml")))
+        self.compose_file = _COMPOSE_FILE
         self.window = None
-        self.web_dir = Path(get_resource_path("web"))
+        self.web_dir = _WEB_DIR
         self.dev_mode = dev_mode
         self.api_port = api_port
         self.processes = []
-        self._is_cleaning_up = False
+        self._app = None  # Production ASGI app, built on the main thread in run()
+        # On Windows children join a job so their whole tree dies with it,
+        # including workers that detach from the tree psutil can walk
+        self._job = _create_kill_on_close_job() if sys.platform == 'win32' else None
+        self._cleanup_lock = threading.Lock()
         self.js_api = Api(self)  # Pass self reference
         
         # Register cleanup handlers
         atexit.register(self.full_cleanup)
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
+        if _USE_SIGWAIT:
+            # Must happen before any other thread starts so they all inherit
+            # the mask; the handlers above then only cover spawn windows
+            signal.pthread_sigmask(signal.SIG_BLOCK, _SHUTDOWN_SIGNALS)
+            threading.Thread(target=self._signal_loop, name="signal_waiter", daemon=True).start()
+
+    def _launch(self, cmd, cwd=None):
+        """Spawn a child process and track it for cleanup"""
+        process = _spawn(cmd, cwd)
+        if self._job:
+            _kernel32.AssignProcessToJobObject(self._job, int(process._handle))
+        self.processes.append(process)
+        return process
 
     def kill_process_tree(self, pid):
         """Kill a process and all its children"""
+        if sys.platform != 'win32':
+            # Our children are started with start_new_session=True, so each
+            # leads its own process group and the whole tree can be signalled
+            # at once without walking /proc
+            try:
+                if os.getpgid(pid) == pid:
+                    os.killpg(pid, signal.SIGTERM)
+                    time.sleep(0.1)
+                    os.killpg(pid, signal.SIGKILL)
+                    return
+            except ProcessLookupError:
+                return  # Whole group already gone
+            except PermissionError:
+                pass
+
+        import psutil
         try:
             parent = psutil.Process(pid)
-            children = parent.children(recursive=True)
-            
-            # Kill children
-            for child in children:
-                try:
-                    child.kill()
-                except psutil.NoSuchProcess:
-                    pass
-            
-            # Kill parent
+            procs = parent.children(recursive=True) + [parent]
+        except psutil.NoSuchProcess:
+            return
+
+        # Ask everything to exit in one pass, then force whatever is left
+        for proc in procs:
             try:
-                parent.kill()
+                proc.terminate()
             except psutil.NoSuchProcess:
                 pass
-            
-            psutil.wait_procs(children + [parent], timeout=5)
-        except psutil.NoSuchProcess:
-            pass
+        _, alive = psutil.wait_procs(procs, timeout=1.5)
+        for proc in alive:
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                pass
+        psutil.wait_procs(alive, timeout=1.0)
+
+    def _signal_loop(self):
+        """Wait for a shutdown signal and clean up from normal thread context"""
+        signal.sigwait(_SHUTDOWN_SIGNALS)
+        print("\nReceived signal to terminate...")
+        self.full_cleanup()
 
     def signal_handler(self, signum, frame):
         """Handle interrupt signals"""
@@ -104,9 +319,8 @@ class TakManagerApp:
 
     def cleanup_setup(self):
         """Simplified cleanup for single window"""
-        if self._is_cleaning_up:
+        if not self._cleanup_lock.acquire(blocking=False):
             return
-        self._is_cleaning_up = True
         
         if self.dev_mode:
             for process in self.processes:
@@ -116,18 +330,21 @@ class TakManagerApp:
                     except Exception:
                         pass
 
-        self._is_cleaning_up = False
+        self._cleanup_lock.release()
 
     def full_cleanup(self):
         """Simplified full cleanup"""
-        if self._is_cleaning_up:
+        # Never released: this ends in os._exit, later callers just return
+        if not self._cleanup_lock.acquire(blocking=False):
             return
-        self._is_cleaning_up = True
         
-        try:
-            stop_container(self.compose_file)
-        except Exception:
-            pass
+        # In dev mode the container is started by the API subprocess, so we
+        # can't tell whether it is up; in-process we know and skip the no-op
+        if self.dev_mode or is_container_started():
+            try:
+                stop_container(self.compose_file)
+            except Exception:
+                pass
 
         try:
             if self.window:
@@ -135,7 +352,37 @@ class TakManagerApp:
         except Exception:
             pass
 
-        for process in self.processes:
+        remaining = self.processes
+        if self._job:
+            # Closing the last handle terminates everything in the job; the
+            # psutil walk below only mops up anything that failed to join
+            _kernel32.CloseHandle(self._job)
+            self._job = None
+        elif sys.platform != 'win32':
+            # Each child leads its own process group: signal every group in
+            # one pass and share a single grace period between them
+            groups = []
+            remaining = []
+            for process in self.processes:
+                try:
+                    if os.getpgid(process.pid) == process.pid:
+                        os.killpg(process.pid, signal.SIGTERM)
+                        groups.append(process.pid)
+                    else:
+                        remaining.append(process)
+                except ProcessLookupError:
+                    pass
+                except PermissionError:
+                    remaining.append(process)
+            if groups:
+                time.sleep(0.3)
+                for pgid in groups:
+                    try:
+                        os.killpg(pgid, signal.SIGKILL)
+                    except (ProcessLookupError, PermissionError):
+                        pass
+
+        for process in remaining:
             try:
                 self.kill_process_tree(process.pid)
             except Exception:
@@ -145,76 +392,66 @@ class TakManagerApp:
 
     def wait_for_server(self, url: str, timeout: int = 30) -> bool:
         """Wait for a server to be ready"""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                response = requests.get(url)
-                if response.status_code == 200:
-                    return True
-            except requests.RequestException:
-                pass
-            time.sleep(1)
+        # Poll tightly at first since local servers are usually up within
+        # a fraction of a second, then back off
+        deadline = time.monotonic() + timeout
+        delay = 0.02
+        parts = urlsplit(url)
+        address = (parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        while time.monotonic() < deadline:
+            # A bare TCP connect is far cheaper than an HTTP request, only
+            # confirm over HTTP once the server is listening
+            if _port_open(*address):
+                try:
+                    # Any non-5xx answer means the server is up
+                    if _probe(url) < 500:
+                        return True
+                except requests.RequestException:
+                    pass
+            time.sleep(delay)
+            delay = min(delay * 1.7, 0.5)
         return False
 
     def start_api_server(self):
         """Start the FastAPI server"""
-        try:
-            app = create_app(dev_mode=self.dev_mode)
-            
-            if self.dev_mode:
-                uvicorn.run(
-                    "app:create_dev_app",
-                    host="127.0.0.1",
-                    port=self.api_port,
-                    reload=True,
-                    factory=True
-                )
-            else:
-                uvicorn.run(
-                    app,
-                    host="127.0.0.1",
-                    port=self.api_port,
-                    log_level="error"
-                )
-        except Exception:
-            raise
+        start_api_server(self.dev_mode, self.api_port, self._app)
 
     def run(self):
         """Run the application"""
+        # The GUI toolkit is only needed here, keep it out of API-only processes
+        import webview
+        webview.settings['ALLOW_DOWNLOADS'] = True
         try:
             if self.dev_mode:
                 try:
-                    npm_cmd = 'npm.cmd' if sys.platform == 'win32' else 'npm'
-                    vite_process = subprocess.Popen(
-                        [npm_cmd, 'run', 'dev'],
-                        cwd=str(self.web_dir),
-                        start_new_session=True
-                    )
-                    self.processes.append(vite_process)
+                    self._launch([NPM_CMD, 'run', 'dev'], cwd=str(self.web_dir))
                 except subprocess.CalledProcessError:
                     sys.exit(1)
 
-                api_process = subprocess.Popen(
-                    [sys.executable, str(Path(__file__)), '--dev', '--port', str(self.api_port)],
-                    start_new_session=True
+                self._launch(
+                    [sys.executable, str(Path(__file__)), '--dev', '--port', str(self.api_port)]
                 )
-                self.processes.append(api_process)
 
                 frontend_url = "http://localhost:3000"
                 backend_url = f"http://localhost:{self.api_port}/health"
                 
-                if not self.wait_for_server(frontend_url):
+                # Both servers warm up independently, wait for them together
+                frontend_ready, backend_ready = asyncio.run(_probe_all(frontend_url, backend_url))
+                if not frontend_ready:
                     raise Exception("Frontend server failed to start")
-                if not self.wait_for_server(backend_url):
+                if not backend_ready:
                     raise Exception("Backend server failed to start")
 
             else:
+                # Build the frontend (if needed) while the API server starts up
+                build_process = None
                 dist_dir = self.web_dir / "dist"
                 if not dist_dir.exists():
-                    npm_cmd = 'npm.cmd' if sys.platform == 'win32' else 'npm'
-                    subprocess.run([npm_cmd, 'run', 'build'], cwd=str(self.web_dir), check=True)
-                
-                import threading
+                    build_process = self._launch([NPM_CMD, 'run', 'build'], cwd=str(self.web_dir))
+
+                # Build the app here while npm runs, so a failure raises now
+                # instead of killing the server thread and timing out below
+                self._app = create_app(dev_mode=False)
                 api_thread = threading.Thread(
                     target=self.start_api_server,
                     name="api_server",
@@ -225,6 +462,8 @@ class TakManagerApp:
                 backend_url = f"http://localhost:{self.api_port}/health"
                 if not self.wait_for_server(backend_url):
                     raise Exception("Backend server failed to start")
+                if build_process and build_process.wait() != 0:
+                    raise Exception("Frontend build failed")
 
             frontend_url = "http://localhost:3000" if self.dev_mode else f"http://localhost:{self.api_port}"
             try:
@@ -251,14 +490,45 @@ class TakManagerApp:
             self.full_cleanup()
             sys.exit(1)
 
+def start_api_server(dev_mode, api_port, app=None):
+    """Start the FastAPI server, optionally serving an already built app"""
+    if dev_mode:
+        uvicorn.run(
+            "app:create_dev_app",
+            host="127.0.0.1",
+            port=api_port,
+            reload=True,
+            factory=True
+        )
+    else:
+        # Drive the server directly: no reload/worker supervision is needed,
+        # uvicorn skips signal handlers off the main thread, and "auto"
+        # picks uvloop/httptools when they're bundled (see the spec file)
+        config = uvicorn.Config(
+            app if app is not None else create_app(dev_mode=False),
+            host="127.0.0.1",
+            port=api_port,
+            log_level="error",
+            loop="auto",
+            http="auto",
+            lifespan="off",
+            access_log=False
+        )
+        uvicorn.Server(config).run()
+
+def _configure_dev_logging():
+    """Show the API handlers' log output on the console outside packaged builds"""
+    logging.basicConfig(format="%(message)s")
+    logging.getLogger("api").setLevel(logging.DEBUG)
+
 def create_dev_app():
     """Factory function for development server with auto-reload."""
+    # Runs in uvicorn's reload worker, which never goes through main()
+    _configure_dev_logging()
     return create_app(dev_mode=True)
 
 def main():
     import argparse
-    import sys
-    import webview  # Add missing import
     
     # Check if we're running as a packaged executable
     is_packaged = getattr(sys, 'frozen', False)
@@ -272,22 +542,22 @@ def main():
             print("\nReceived keyboard interrupt...")
         except Exception as e:
             print(f"Unexpected error: {e}")
-        finally:
-            app.full_cleanup()
-            sys.exit(0)
+        # Cleanup runs from the atexit hook registered by TakManagerApp
+        sys.exit(0)
     else:
         # Development mode - handle arguments
+        _configure_dev_logging()
         parser = argparse.ArgumentParser(description='TAK Manager')
         parser.add_argument('--dev', action='store_true', help='Run in development mode')
         parser.add_argument('--port', type=int, default=8000, help='API port (default: 8000)')
         
         # Filter out any PyInstaller-related arguments
-        filtered_args = [arg for arg in sys.argv[1:] if not any(x in arg for x in ['_internal', 'Frameworks'])]
+        filtered_args = [arg for arg in sys.argv[1:] if not _PYI_ARG_RE.search(arg)]
         args = parser.parse_args(filtered_args)
 
         # If no additional arguments are provided or only --dev, run the full application
-        app = TakManagerApp(dev_mode=args.dev, api_port=args.port)
         if not filtered_args or (len(filtered_args) == 1 and filtered_args[0] == '--dev'):
+            app = TakManagerApp(dev_mode=args.dev, api_port=args.port)
             try:
                 app.run()
             except KeyboardInterrupt:
@@ -298,10 +568,9 @@ def main():
                 app.full_cleanup()
                 sys.exit(0)
         else:
-            # If arguments are provided, assume we're starting just the API server
-            app.start_api_server()
+            # If arguments are provided, assume we're starting just the API server.
+            # No window or child processes here, so skip the app's cleanup hooks.
+            start_api_server(args.dev, args.port)
 
 if __name__ == '__main__':
-    # Enable downloads and create window
-    webview.settings['ALLOW_DOWNLOADS'] = True
-    main()  # Call main instead of creating a separate window 
\ No newline at end of file
+    main() 
\ No newline at end of file
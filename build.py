@@ -3,7 +3,10 @@ import os
 import sys
 import shutil
 import subprocess
+import hashlib
 import logging
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -25,6 +28,15 @@ def setup_logging():
     
     return log_file
 
+def _dependency_hash(web_dir):
+    """Hash the files that determine what npm install produces"""
+    digest = hashlib.blake2b()
+    for name in ('package.json', 'package-lock.json'):
+        path = web_dir / name
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
 def build_frontend():
     """Build the React frontend"""
     web_dir = Path("web")
@@ -35,14 +47,19 @@ def build_frontend():
     logging.info("Building frontend...")
     npm_cmd = 'npm.cmd' if sys.platform == 'win32' else 'npm'
     try:
-        # Clean previous build
-        dist_dir = web_dir / "dist"
-        if dist_dir.exists():
-            logging.info("Cleaning previous frontend build...")
-            shutil.rmtree(dist_dir)
-
-        # Install dependencies
-        subprocess.run([npm_cmd, 'install'], cwd=web_dir, check=True)
+        # Clean previous build, a missing dist is simply ignored
+        logging.info("Cleaning previous frontend build...")
+        shutil.rmtree(web_dir / "dist", ignore_errors=True)
+
+        # Install dependencies unless node_modules was installed from the
+        # same package manifests
+        stamp = web_dir / "node_modules" / ".tak-install-stamp"
+        if stamp.exists() and stamp.read_text() == _dependency_hash(web_dir):
+            logging.info("Frontend dependencies up to date, skipping npm install")
+        else:
+            subprocess.run([npm_cmd, 'install', '--no-audit', '--no-fund'], cwd=web_dir, check=True)
+            # Hash after installing, npm writes or updates the lock file
+            stamp.write_text(_dependency_hash(web_dir))
         # Build frontend
         subprocess.run([npm_cmd, 'run', 'build'], cwd=web_dir, check=True)
     except subprocess.CalledProcessError as e:
@@ -51,11 +68,9 @@ def build_frontend():
 
 def clean_build():
     """Clean build directories"""
-    dirs_to_clean = ['build', 'dist', '__pycache__']
-    for dir_name in dirs_to_clean:
-        if os.path.exists(dir_name):
-            logging.info(f"Cleaning {dir_name}...")
-            shutil.rmtree(dir_name)
+    # build/ is kept so PyInstaller can reuse its cached analysis. Missing
+    # directories are fine, rmtree below ignores them.
+    dirs_to_clean = ['dist']
     
     # Remove any .spec files if not using our specific one
     for spec_file in Path('.').glob('*.spec'):
@@ -63,10 +78,17 @@ def clean_build():
             logging.info(f"Removing {spec_file}...")
             spec_file.unlink()
             
-    # Clean pycache in subdirectories
-    for pycache_dir in Path('.').glob('**/__pycache__'):
-        logging.info(f"Cleaning {pycache_dir}...")
-        shutil.rmtree(pycache_dir)
+    # Clean pycache, including the top-level one
+    dirs_to_clean += [str(d) for d in Path('.').glob('**/__pycache__')]
+
+    # The trees are independent and removal is dominated by per-file unlink
+    # calls, so remove them concurrently
+    def remove(dir_name):
+        logging.info(f"Cleaning {dir_name}...")
+        shutil.rmtree(dir_name, ignore_errors=True)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(remove, dirs_to_clean))
 
 def ensure_resources():
     """Ensure all required resources exist"""
@@ -82,10 +104,25 @@ def ensure_resources():
 
     platform_file = required_files.get(sys.platform)
     if platform_file:
-        icon_path = resources_dir / platform_file
-        if not icon_path.exists():
+        # One directory read instead of a stat per expected file
+        with os.scandir(resources_dir) as entries:
+            present = {entry.name for entry in entries if entry.is_file()}
+        if platform_file not in present:
             logging.warning(f"{platform_file} not found in resources directory")
 
+def _fast_zip(out_path, src_dir, arcname_root=''):
+    """Zip a directory with the same layout as shutil.make_archive"""
+    # Level 1 trades a slightly larger archive for much faster compression
+    src_dir = Path(src_dir)
+    with zipfile.ZipFile(out_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for root, dirs, files in os.walk(src_dir):
+            dirs.sort()
+            rel_dir = Path(arcname_root) / Path(root).relative_to(src_dir)
+            if rel_dir != Path('.'):
+                zf.write(root, str(rel_dir))
+            for name in sorted(files):
+                zf.write(os.path.join(root, name), str(rel_dir / name))
+
 def create_debug_script():
     """Create a debug launch script"""
     if sys.platform == "darwin":
@@ -124,7 +161,11 @@ def build_app():
 
         # Run PyInstaller
         logging.info("Building application with PyInstaller...")
-        subprocess.run(['pyinstaller', 'tak-manager.spec', '--clean'], check=True)
+        subprocess.run(
+            ['pyinstaller', '--noconfirm', '--workpath', 'build/.pyi-work',
+             '--distpath', 'dist', 'tak-manager.spec'],
+            check=True
+        )
 
         # Create debug launch script
         create_debug_script()
@@ -135,27 +176,23 @@ def build_app():
             app_name = 'TAK Manager.app'
             if (dist_dir / app_name).exists():
                 logging.info("Creating macOS ZIP archive...")
-                shutil.make_archive(
-                    str(dist_dir / 'TAK-Manager-macOS'),
-                    'zip',
-                    dist_dir,
-                    app_name
-                )
+                _fast_zip(dist_dir / 'TAK-Manager-macOS.zip', dist_dir / app_name, app_name)
         elif sys.platform == 'win32':
             app_dir = dist_dir / 'TAK Manager'
             if app_dir.exists():
                 logging.info("Creating Windows distribution archive...")
-                shutil.make_archive(
-                    str(dist_dir / 'TAK-Manager-Windows'),
-                    'zip',
-                    app_dir
-                )
+                _fast_zip(dist_dir / 'TAK-Manager-Windows.zip', app_dir)
         else:  # Linux
             app_dir = dist_dir / 'tak-manager'
             if app_dir.exists():
                 logging.info("Creating Linux distribution archive...")
                 archive_name = str(dist_dir / 'TAK-Manager-Linux.tar.gz')
-                subprocess.run(['tar', 'czf', archive_name, '-C', str(dist_dir), 'tak-manager'])
+                # pigz writes the same gzip format using every core
+                if shutil.which('pigz'):
+                    tar_cmd = ['tar', '-I', 'pigz', '-cf', archive_name]
+                else:
+                    tar_cmd = ['tar', 'czf', archive_name]
+                subprocess.run(tar_cmd + ['-C', str(dist_dir), 'tak-manager'])
 
         logging.info("Build completed successfully!")
         logging.info(f"Output can be found in the {dist_dir} directory")
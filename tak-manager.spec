@@ -2,6 +2,7 @@
 import sys
 from pathlib import Path
 import glob
+import importlib.util
 import os
 
 block_cipher = None
@@ -46,6 +47,16 @@ datas = [
     ('../.env', '.'),  # Environment file
 ]
 
+# uvicorn picks its event loop and HTTP parser by import string at runtime,
+# so bundle the fast implementations explicitly when they are installed
+hiddenimports = []
+for module, impl in [
+    ('uvloop', 'uvicorn.loops.uvloop'),
+    ('httptools', 'uvicorn.protocols.http.httptools_impl'),
+]:
+    if importlib.util.find_spec(module):
+        hiddenimports += [module, impl]
+
 # Add platform-specific resources
 if icon.exists():
     datas.append((str(icon), '.'))
@@ -55,6 +66,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=datas,
+    hiddenimports=hiddenimports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,11 @@
+from fastapi.testclient import TestClient
+
+from api import create_app
+
+
+def test_health_answers_head_without_a_body():
+    client = TestClient(create_app(dev_mode=True))
+    response = client.head('/health')
+    assert response.status_code == 200
+    assert response.content == b''
+    assert client.get('/health').json() == {'status': 'healthy'}
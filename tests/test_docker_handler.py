@@ -0,0 +1,81 @@
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+from api.handlers import docker_handler
+
+
+class _StubDaemon(http.server.BaseHTTPRequestHandler):
+    """Answers the handful of Engine API calls a liveness check makes"""
+
+    ping_delay = 0
+
+    def do_GET(self):
+        if self.path.endswith('/version'):
+            body = json.dumps({'ApiVersion': '1.45', 'Version': '26.1.0'}).encode()
+            content_type = 'application/json'
+        elif self.path.endswith('/_ping'):
+            time.sleep(self.ping_delay)
+            body, content_type = b'OK', 'text/plain'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _StubDaemon)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv('DOCKER_HOST', f'tcp://127.0.0.1:{server.server_port}')
+    monkeypatch.delenv('DOCKER_TLS_VERIFY', raising=False)
+    monkeypatch.setattr(docker_handler, '_docker_installed', False)
+    docker_handler._reset_client()
+    yield _StubDaemon
+    docker_handler._reset_client()
+    _StubDaemon.ping_delay = 0
+    server.shutdown()
+    server.server_close()
+
+
+def test_wait_for_docker_sees_running_daemon(daemon):
+    assert docker_handler.wait_for_docker(timeout=1)
+
+
+def test_check_docker_running_sees_running_daemon(daemon):
+    assert docker_handler.check_docker_running()
+
+
+def test_check_docker_installed_sees_running_daemon(daemon):
+    assert docker_handler.check_docker_installed()
+
+
+def test_wait_for_docker_bounds_a_hung_ping(daemon):
+    daemon.ping_delay = docker_handler._PING_TIMEOUT + 3
+    start = time.monotonic()
+    assert not docker_handler.wait_for_docker(timeout=0.5)
+    assert time.monotonic() - start < docker_handler._PING_TIMEOUT + 2
+
+
+def test_compose_project_name_strips_leading_separators(tmp_path, monkeypatch):
+    # PyInstaller onedir builds resolve resources under '_internal'
+    compose_dir = tmp_path / '_internal'
+    compose_dir.mkdir()
+    compose_file = compose_dir / 'docker-compose.yml'
+    compose_file.write_text(
+        f"services:\n  {docker_handler.COMPOSE_SERVICE}:\n    image: tak-manager:latest\n"
+    )
+    monkeypatch.delenv('COMPOSE_PROJECT_NAME', raising=False)
+    spec = docker_handler.load_compose_service(str(compose_file), {})
+    assert spec['name'] == f'internal-{docker_handler.COMPOSE_SERVICE}-1'
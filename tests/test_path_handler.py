@@ -0,0 +1,22 @@
+import pytest
+
+from api.handlers.path_handler import _update_env_file, parse_env_file
+
+
+@pytest.mark.parametrize('value', [
+    '/opt/tak',
+    '/a b #1',
+    'C:\\Program Files\\TAK',
+    "it's here",
+    'say "hi" it\'s \\ here #x',
+    '8443',
+    '',
+])
+def test_saved_values_read_back_unchanged(tmp_path, value):
+    env_file = tmp_path / '.env'
+    env_file.write_text('# settings\nTAK_SERVER_INSTALL_DIR=/old\nOTHER=1 # kept\n')
+    _update_env_file(env_file, {'TAK_SERVER_INSTALL_DIR': value, 'BACKEND_PORT': value})
+    env = parse_env_file(env_file)
+    assert env['TAK_SERVER_INSTALL_DIR'] == value
+    assert env['BACKEND_PORT'] == value
+    assert env['OTHER'] == '1'